@@ -6,15 +6,28 @@ AI-Powered Commercial Real Estate Platform
 """
 
 import streamlit as st
-import pandas as pd
 import json
+import bisect
 import uuid
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import lru_cache
 import hashlib
+import hmac
+import importlib.util
 import sqlite3
-from typing import Dict, List, Optional
+import threading
+from types import MappingProxyType
 from pathlib import Path
+import bcrypt
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# numba is optional and slow to import; only probe for it here
+_NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
 
 # Page configuration
 st.set_page_config(
@@ -27,6 +40,8 @@ st.set_page_config(
 DB_FILE = 'equireal.db'
 UPLOAD_DIR = Path('uploads')
 UPLOAD_DIR.mkdir(exist_ok=True)
+BULK_BATCH_SIZE = 10000
+DEMO_USER_ID = "demo_user"
 
 INDUSTRIES = [
     "Software as a Service (SaaS)", "FinTech", "HealthTech", "E-commerce",
@@ -35,25 +50,459 @@ INDUSTRIES = [
     "Marketing Agency", "Consulting", "Other"
 ]
 
-GLOBAL_LOCATIONS = [
+GLOBAL_LOCATIONS = (
     "New York, NY, USA", "Los Angeles, CA, USA", "San Francisco, CA, USA",
     "Chicago, IL, USA", "Boston, MA, USA", "Seattle, WA, USA", "Austin, TX, USA",
     "Miami, FL, USA", "Denver, CO, USA", "Atlanta, GA, USA", "Toronto, ON, Canada",
     "London, UK", "Paris, France", "Berlin, Germany", "Tokyo, Japan", "Singapore"
-]
+)
 
-BUSINESS_TYPES = [
+BUSINESS_TYPES = (
     "SaaS Startup", "E-commerce", "Restaurant", "Retail Store", "Professional Services",
     "Manufacturing", "Healthcare Services", "Consulting", "Other"
-]
+)
 
-class DatabaseManager:
-    def __init__(self):
-        self.db_file = DB_FILE
-        self.init_database()
+PROPERTY_TYPES = ("Office", "Retail", "Industrial")
+PRICE_RANGES = ("$0-25/sq ft", "$25-50/sq ft", "$50+/sq ft")
+
+DEAL_STATUSES = ["pending", "approved", "rejected"]
+
+# Static page copy, built once at import
+HOME_BUSINESS_MD = """
+**🏢 For Businesses**
+
+Get reduced rent in exchange for equity and revenue share.
+- Reduce monthly rent by 20-60%
+- AI-powered risk assessment
+- Custom deal structuring
+- Connect with landlords
+"""
+
+HOME_LANDLORD_MD = """
+**🏠 For Property Owners**
+
+Participate in tenant success through equity sharing.
+- Higher returns than traditional leases
+- Equity upside in growing companies
+- AI-screened tenants
+- Professional management
+"""
+
+DASHBOARD_APPLICATION_MD = """
+**📋 Create Your First Application**
+
+Complete our AI-powered application to get personalized deal terms.
+- 3-step process
+- AI risk assessment
+- Custom deal terms
+- Instant proposals
+"""
+
+DASHBOARD_BROWSE_MD = """
+**🔍 Browse Properties**
+
+Find commercial spaces from forward-thinking landlords.
+- Curated listings
+- Partner landlords
+- Advanced filters
+- Virtual tours
+"""
+
+# Static page chrome, built once at import
+HERO_HTML = """
+<div class="eq-hero">
+    <h1>🏢 EquiReal</h1>
+    <p>AI-Powered Commercial Real Estate Platform</p>
+</div>
+"""
+
+AUTH_HERO_HTML = """
+<div class="eq-hero">
+    <h1>🏢 EquiReal Enterprise</h1>
+    <p>AI-Powered Commercial Real Estate Platform</p>
+</div>
+"""
+
+HOME_HERO_HTML = """
+<div class="eq-hero">
+    <h1>🏢 EquiReal</h1>
+    <h3>Renting the Opportunity</h3>
+    <p>Revolutionary AI-powered commercial real estate platform transforming lease structures.</p>
+</div>
+"""
+
+SIDEBAR_HEADER_HTML = """
+<div class="eq-sidebar-header">
+    <h2>🏢 EquiReal</h2>
+    <p>Enterprise Platform</p>
+</div>
+"""
+
+# Featured listings for property search; card markdown is rendered once at import
+PROPERTIES = (
+    {
+        'name': 'Innovation Hub Downtown',
+        'location': 'San Francisco, CA',
+        'size': '1,200-5,000 sq ft',
+        'price': '$45/sq ft/year'
+    },
+    {
+        'name': 'Tech Center Austin',
+        'location': 'Austin, TX',
+        'size': '800-3,000 sq ft',
+        'price': '$28/sq ft/year'
+    }
+)
+
+PROPERTY_CARD_MD = """
+#### {name}
+
+📍 {location}
+
+📐 {size}
+
+💰 {price}
+"""
+
+PROPERTY_CARDS = tuple((prop['name'], PROPERTY_CARD_MD.format_map(prop)) for prop in PROPERTIES)
+
+# Sidebar navigation per user type as (label, page); unknown types get the landlord set
+SIDEBAR_NAV = {
+    'business': (
+        ("🏠 Dashboard", 'business_dashboard'),
+        ("🚀 New Application", 'business_application'),
+        ("🔍 Property Search", 'property_search')
+    ),
+    'landlord': (
+        ("🏠 Dashboard", 'landlord_dashboard'),
+    )
+}
+
+# Static stat strips as (label, value, delta)
+BUSINESS_STATS = (
+    ("Applications", "0", "Start your first!"),
+    ("Proposals", "0", "Pending"),
+    ("Active Deals", "0", "No deals yet"),
+    ("Savings", "$0", "Potential")
+)
+
+PLATFORM_STATS = (
+    ("Businesses Analyzed", "1,247", None),
+    ("Deals Completed", "89", None),
+    ("Partner Landlords", "156", None),
+    ("AI Accuracy", "94.2%", None)
+)
+
+# Landlord pipeline card, filled with %-formatting per deal
+DEAL_CARD_HTML = """
+<div class="eq-card eq-card-shadow">
+    <h4>%s %s</h4>
+    <p><strong>Industry:</strong> %s</p>
+    <p><strong>Location:</strong> %s</p>
+    <p><strong>Space:</strong> %s sq ft</p>
+    <p><strong>Risk Score:</strong> %.1f/100</p>
+</div>
+"""
+
+# Industry risk mapping (unlisted industries score 50)
+INDUSTRY_RISKS = MappingProxyType({
+    "Software as a Service (SaaS)": 25,
+    "FinTech": 35,
+    "E-commerce": 45,
+    "Restaurants": 70,
+    "Professional Services": 30,
+    "Manufacturing": 50
+})
+
+# INDUSTRY_RISKS aligned to INDUSTRIES category codes; the trailing slot is
+# the default for code -1 (industries outside INDUSTRIES)
+INDUSTRY_RISK_TABLE = np.array(
+    [INDUSTRY_RISKS.get(industry, 50) for industry in INDUSTRIES] + [50],
+    dtype=np.int8
+)
+
+# Risk band step functions: DELTAS[i] applies between BINS[i-1] and BINS[i].
+# Revenue bands are right-closed (no revenue, up to 50k, up to 100k, above);
+# team bands are left-closed (under 3, 3-4, 5-50, over 50).
+REVENUE_BINS = (0, 50000, 100000)
+REVENUE_DELTAS = (20, 0, -10, -20)
+TEAM_BINS = (3, 5, 51)
+TEAM_DELTAS = (20, 0, -15, 0)
+
+# Risk display buckets: < 40 low, < 70 medium, otherwise high.
+# bisect_right over RISK_BUCKETS matches np.digitize for whole columns.
+RISK_BUCKETS = (40, 70)
+RISK_EMOJI = ("🟢", "🟡", "🔴")
+RISK_COLOR = ("#10b981", "#f59e0b", "#ef4444")
+
+def dumps_json(data):
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(data)
+
+def loads_json(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+# bcrypt only accepts passwords up to 72 bytes
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+def password_too_long(password):
+    return len(password.encode()) > BCRYPT_MAX_PASSWORD_BYTES
+
+def hash_password(password):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=12)).decode()
+
+def _is_legacy_hash(password_hash):
+    # Accounts created before bcrypt store an unsalted SHA-256 hex digest
+    return not password_hash.startswith('$2')
+
+def verify_password(password, password_hash):
+    if _is_legacy_hash(password_hash):
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), password_hash)
+    if password_too_long(password):
+        return False
+    return bcrypt.checkpw(password.encode(), password_hash.encode())
+
+def _risk_numeric(industry_risk, current_revenue, is_profitable, team_size):
+    # Financial risk calculation
+    revenue_band = 0
+    while revenue_band < len(REVENUE_BINS) and current_revenue > REVENUE_BINS[revenue_band]:
+        revenue_band += 1
+    
+    financial_risk = 50 + REVENUE_DELTAS[revenue_band]
+    if is_profitable:
+        financial_risk -= 15
+    
+    # Team risk assessment
+    team_band = 0
+    while team_band < len(TEAM_BINS) and team_size >= TEAM_BINS[team_band]:
+        team_band += 1
+    
+    team_risk = 50 + TEAM_DELTAS[team_band]
+    
+    # Calculate overall risk
+    overall_risk = industry_risk * 0.4 + financial_risk * 0.4 + team_risk * 0.2
+    overall_risk = max(10.0, min(90.0, overall_risk))
     
-    def init_database(self):
-        conn = sqlite3.connect(self.db_file)
+    return overall_risk, financial_risk, team_risk
+
+def _deal_terms_numeric(risk_score, is_profitable, current_revenue, space_size):
+    # Base terms
+    base_upfront_rent = 30
+    base_equity = 5
+    base_revenue_share = 3
+    
+    # Risk adjustments
+    risk_factor = (risk_score - 50) / 50
+    
+    upfront_rent_percent = base_upfront_rent + (risk_factor * 20)
+    equity_percent = base_equity + (risk_factor * 5)
+    revenue_share_percent = base_revenue_share + (risk_factor * 2)
+    
+    # Financial adjustments
+    if is_profitable:
+        upfront_rent_percent -= 5
+        equity_percent -= 1
+    
+    if current_revenue > 100000:
+        upfront_rent_percent -= 8
+        equity_percent -= 1.5
+    
+    # Apply bounds
+    upfront_rent_percent = max(15, min(55, upfront_rent_percent))
+    equity_percent = max(1, min(12, equity_percent))
+    revenue_share_percent = max(0.5, min(6, revenue_share_percent))
+    
+    # Calculate rent
+    base_rate = 35  # per sq ft annually
+    
+    annual_market_rent = space_size * base_rate
+    monthly_market_rent = annual_market_rent / 12
+    monthly_rent = monthly_market_rent * (upfront_rent_percent / 100)
+    monthly_savings = monthly_market_rent - monthly_rent
+    
+    return (upfront_rent_percent, equity_percent, revenue_share_percent,
+            monthly_rent, monthly_market_rent, monthly_savings)
+
+def _jit(func, *warmup_args):
+    if not _NUMBA_AVAILABLE:
+        return func
+    
+    try:
+        from numba import njit
+    except ImportError:
+        # Installed but unusable, e.g. built against a different NumPy
+        return func
+    
+    kernel = njit(func)
+    kernel(*warmup_args)  # warm up so the first submission doesn't pay the JIT cost
+    return kernel
+
+def _code_key(func):
+    code = func.__code__
+    return code.co_code, code.co_consts, code.co_names
+
+# Streamlit re-executes this script on every rerun, so the kernels are
+# compiled (and memoized) once per process here rather than with
+# module-level decorators. cache_resource only keys on the factory's own
+# source, so the kernel's bytecode and the band tables it bakes in are
+# passed as arguments: editing either rebuilds the kernel.
+@st.cache_resource(show_spinner=False)
+def _compile_risk_kernel(code_key, revenue_bins, revenue_deltas, team_bins, team_deltas):
+    return lru_cache(maxsize=1024)(_jit(_risk_numeric, 50.0, 0.0, False, 1.0))
+
+@st.cache_resource(show_spinner=False)
+def _compile_deal_terms_kernel(code_key):
+    return _jit(_deal_terms_numeric, 50.0, False, 0.0, 1000.0)
+
+def _risk_kernel():
+    return _compile_risk_kernel(_code_key(_risk_numeric), REVENUE_BINS, REVENUE_DELTAS, TEAM_BINS, TEAM_DELTAS)
+
+def _deal_terms_kernel():
+    return _compile_deal_terms_kernel(_code_key(_deal_terms_numeric))
+
+PROPOSAL_RULE = "=" * 50
+PROPOSAL_SECTION_RULE = "-" * 50
+
+# Proposal sections, filled with str.format_map; rules are spliced in at import
+PROPOSAL_PARTS = (
+    """EQUIREAL ENTERPRISE PROPOSAL
+""" + PROPOSAL_RULE + """
+Proposal ID: {proposal_id}
+Generated: {generated}
+
+""",
+    """EXECUTIVE SUMMARY
+""" + PROPOSAL_SECTION_RULE + """
+Business: {business_name}
+Industry: {industry}
+Location: {location}
+Space: {space_size:,} sq ft
+AI Risk Score: {overall_risk:.1f}/100
+
+""",
+    """PROPOSED DEAL TERMS
+""" + PROPOSAL_SECTION_RULE + """
+Upfront Rent: {upfront_rent_percent:.1f}% of market rate
+Monthly Rent: ${monthly_rent:,.0f}
+Equity Stake: {equity_percent:.1f}%
+Revenue Share: {revenue_share_percent:.1f}%
+Monthly Savings: ${monthly_savings:,.0f}
+
+""",
+    "EquiReal - Renting the Opportunity"
+)
+
+@st.cache_resource(show_spinner=False)
+def _css_blob():
+    return """
+    <style>
+    .eq-hero, .eq-sidebar-header {
+        text-align: center;
+        background: linear-gradient(135deg, #2563eb, #7c3aed);
+        border-radius: 16px;
+        margin-bottom: 2rem;
+    }
+    .eq-hero { padding: 2rem; color: white; }
+    .eq-sidebar-header { padding: 1.5rem; }
+    .eq-sidebar-header h2 { color: white; margin: 0; }
+    .eq-sidebar-header p { color: rgba(255,255,255,0.9); margin: 0.5rem 0 0 0; }
+    .eq-card {
+        background: white;
+        border: 1px solid #e5e7eb;
+        border-radius: 12px;
+        padding: 1.5rem;
+        margin: 1rem 0;
+    }
+    .eq-card-shadow { box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+    .eq-stats { display: flex; gap: 1rem; margin-bottom: 1rem; }
+    .eq-stat { flex: 1; }
+    .eq-stat p { margin: 0; font-size: 0.875rem; }
+    .eq-stat h2 { margin: 0; padding: 0.25rem 0; }
+    .eq-stat-delta { color: #10b981; }
+    </style>
+    """
+
+# One flex row of (label, value, delta) stats, sent as a single element
+@st.cache_data(show_spinner=False)
+def stats_strip_html(stats):
+    cells = []
+    
+    for label, value, delta in stats:
+        delta_html = f'<p class="eq-stat-delta">{delta}</p>' if delta else ''
+        cells.append(f'<div class="eq-stat"><p>{label}</p><h2>{value}</h2>{delta_html}</div>')
+    
+    return f'<div class="eq-stats">{"".join(cells)}</div>'
+
+def load_css():
+    st.markdown(_css_blob(), unsafe_allow_html=True)
+
+def set_page(page):
+    # Used as an on_click callback: it runs before the rerun the click already
+    # triggers, so navigation needs no extra st.rerun()
+    st.session_state.page = page
+
+def nav_button(label, page, **kwargs):
+    return st.button(label, on_click=set_page, args=(page,), **kwargs)
+
+# Hot-path SQL, kept as constants so every call hits the connection's statement cache
+SQL_INSERT_USER = '''
+INSERT INTO users (id, email, password_hash, user_type, profile_data)
+VALUES (?, ?, ?, ?, ?)
+'''
+
+SQL_AUTH = '''
+SELECT id, email, user_type, profile_data, password_hash
+FROM users WHERE email = ?
+'''
+
+SQL_UPDATE_PASSWORD_HASH = 'UPDATE users SET password_hash = ? WHERE id = ?'
+
+SQL_UPDATE_PROFILE = 'UPDATE users SET profile_data = ? WHERE id = ?'
+
+SQL_INSERT_BUSINESS = '''
+INSERT INTO businesses (id, user_id, business_name, industry, location, space_size, financial_data)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+SQL_INSERT_DEAL = '''
+INSERT INTO deals (id, business_id, deal_terms, proposal, risk_score)
+VALUES (?, ?, ?, ?, ?)
+'''
+
+SQL_UPDATE_STATUS = 'UPDATE deals SET status = ? WHERE id = ?'
+
+SQL_GET_DEALS = '''
+SELECT d.*, b.business_name, b.industry, b.location, b.space_size
+FROM deals d
+JOIN businesses b ON d.business_id = b.id
+ORDER BY d.created_at DESC
+LIMIT ? OFFSET ?
+'''
+
+SQL_GET_DEAL = '''
+SELECT d.*, b.business_name, b.industry, b.location, b.space_size
+FROM deals d
+JOIN businesses b ON d.business_id = b.id
+WHERE d.id = ?
+'''
+
+SQL_STATUS_FRAME = '''
+SELECT d.id, b.business_name, b.industry, b.location, d.risk_score, d.status
+FROM deals d
+JOIN businesses b ON d.business_id = b.id
+ORDER BY d.created_at DESC
+'''
+
+SQL_DEAL_STATS = '''
+SELECT COUNT(*), COUNT(CASE WHEN status = 'pending' THEN 1 END), AVG(COALESCE(risk_score, 50))
+FROM deals
+'''
+
+def init_database(conn):
+    with conn:
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -92,131 +541,224 @@ class DatabaseManager:
         )
         ''')
         
-        conn.commit()
-        conn.close()
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_deals_business_id ON deals(business_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_deals_created_at ON deals(created_at DESC)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_businesses_user_id ON businesses(user_id)')
+
+# One connection per process, shared across reruns and sessions;
+# hold get_connection_lock(db_file) while using it
+@st.cache_resource(show_spinner=False)
+def get_connection(db_file):
+    conn = sqlite3.connect(db_file, check_same_thread=False, cached_statements=128)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    conn.execute('PRAGMA mmap_size=268435456')
+    conn.execute('PRAGMA cache_size=-65536')
+    init_database(conn)
+    return conn
+
+@st.cache_resource(show_spinner=False)
+def get_connection_lock(db_file):
+    return threading.RLock()
+
+class DatabaseManager:
+    def __init__(self):
+        self.db_file = DB_FILE
+        self.conn = get_connection(self.db_file)
+        self.lock = get_connection_lock(self.db_file)
     
     def create_user(self, email, password, user_type, profile_data=None):
-        user_id = str(uuid.uuid4())
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
-        
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        user_id = uuid.uuid4().hex
+        password_hash = hash_password(password)
         
         try:
-            cursor.execute('''
-            INSERT INTO users (id, email, password_hash, user_type, profile_data)
-            VALUES (?, ?, ?, ?, ?)
-            ''', (user_id, email, password_hash, user_type, json.dumps(profile_data or {})))
-            conn.commit()
+            with self.lock, self.conn:
+                self.conn.execute(SQL_INSERT_USER, (user_id, email, password_hash, user_type, dumps_json(profile_data or {})))
             return user_id
         except sqlite3.IntegrityError:
             return None
-        finally:
-            conn.close()
     
     def authenticate_user(self, email, password):
-        password_hash = hashlib.sha256(password.encode()).hexdigest()
-        
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        SELECT id, email, user_type, profile_data 
-        FROM users WHERE email = ? AND password_hash = ?
-        ''', (email, password_hash))
-        
-        result = cursor.fetchone()
-        conn.close()
-        
-        if result:
+        with self.lock:
+            cursor = self.conn.execute(SQL_AUTH, (email,))
+            
+            result = cursor.fetchone()
+        
+        if result and verify_password(password, result['password_hash']):
+            # Legacy passwords bcrypt cannot take stay on SHA-256
+            if _is_legacy_hash(result['password_hash']) and not password_too_long(password):
+                # Hash outside the lock: bcrypt is deliberately slow
+                new_hash = hash_password(password)
+                with self.lock, self.conn:
+                    self.conn.execute(SQL_UPDATE_PASSWORD_HASH, (new_hash, result['id']))
+            
             return {
-                'id': result[0],
-                'email': result[1],
-                'user_type': result[2],
-                'profile_data': json.loads(result[3]) if result[3] else {}
+                'id': result['id'],
+                'email': result['email'],
+                'user_type': result['user_type'],
+                'profile_data': loads_json(result['profile_data']) if result['profile_data'] else {}
             }
         return None
     
-    def save_business(self, business_data):
-        business_id = str(uuid.uuid4())
-        
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+    def update_user_profile(self, user_id, profile_data):
+        with self.lock, self.conn:
+            cursor = self.conn.execute(SQL_UPDATE_PROFILE, (dumps_json(profile_data), user_id))
         
-        cursor.execute('''
-        INSERT INTO businesses (id, user_id, business_name, industry, location, space_size, financial_data)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            business_id,
+        return cursor.rowcount > 0
+    
+    @staticmethod
+    def _business_row(business_data):
+        return (
+            uuid.uuid4().hex,
             business_data['user_id'],
             business_data['business_name'],
             business_data['industry'],
             business_data['location'],
             business_data['space_size'],
-            json.dumps(business_data.get('financial_data', {}))
-        ))
-        
-        conn.commit()
-        conn.close()
-        return business_id
+            dumps_json(business_data.get('financial_data', {}))
+        )
     
-    def save_deal(self, deal_data):
-        deal_id = str(uuid.uuid4())
-        
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-        INSERT INTO deals (id, business_id, deal_terms, proposal, risk_score)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (
-            deal_id,
-            deal_data['business_id'],
-            json.dumps(deal_data['deal_terms']),
+    @staticmethod
+    def _deal_row(deal_data, business_id):
+        return (
+            uuid.uuid4().hex,
+            business_id,
+            dumps_json(deal_data['deal_terms']),
             deal_data['proposal'],
             deal_data['risk_score']
-        ))
+        )
+    
+    def save_business(self, business_data):
+        return self.save_businesses_bulk([business_data])[0]
+    
+    def save_businesses_bulk(self, businesses_data):
+        rows = [self._business_row(business_data) for business_data in businesses_data]
+        
+        with self.lock, self.conn:
+            for start in range(0, len(rows), BULK_BATCH_SIZE):
+                self.conn.executemany(SQL_INSERT_BUSINESS, rows[start:start + BULK_BATCH_SIZE])
         
-        conn.commit()
-        conn.close()
-        return deal_id
+        return [row[0] for row in rows]
     
-    def get_deals(self):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+    def save_business_and_deal(self, business_data, deal_data):
+        business_row = self._business_row(business_data)
+        deal_row = self._deal_row(deal_data, business_row[0])
         
-        cursor.execute('''
-        SELECT d.*, b.business_name, b.industry, b.location, b.space_size
-        FROM deals d
-        JOIN businesses b ON d.business_id = b.id
-        ORDER BY d.created_at DESC
-        ''')
+        # Demo submissions are not persisted; they only get fresh ids
+        if business_data['user_id'] == DEMO_USER_ID:
+            return business_row[0], deal_row[0]
+        
+        with self.lock, self.conn:
+            self.conn.execute(SQL_INSERT_BUSINESS, business_row)
+            self.conn.execute(SQL_INSERT_DEAL, deal_row)
         
-        deals = []
-        columns = [desc[0] for desc in cursor.description]
+        clear_deal_caches()
+        return business_row[0], deal_row[0]
+    
+    def save_deal(self, deal_data):
+        return self.save_deals_bulk([deal_data])[0]
+    
+    def save_deals_bulk(self, deals_data):
+        rows = [self._deal_row(deal_data, deal_data['business_id']) for deal_data in deals_data]
         
-        for row in cursor.fetchall():
-            deal_dict = dict(zip(columns, row))
-            if deal_dict.get('deal_terms'):
-                try:
-                    deal_dict['deal_terms'] = json.loads(deal_dict['deal_terms'])
-                except:
-                    deal_dict['deal_terms'] = {}
-            deals.append(deal_dict)
+        with self.lock, self.conn:
+            for start in range(0, len(rows), BULK_BATCH_SIZE):
+                self.conn.executemany(SQL_INSERT_DEAL, rows[start:start + BULK_BATCH_SIZE])
         
-        conn.close()
-        return deals
+        clear_deal_caches()
+        return [row[0] for row in rows]
+    
+    def get_deals(self, limit=None, offset=0):
+        return load_deals(self.db_file, limit, offset)
+    
+    def get_deal_by_id(self, deal_id):
+        return load_deal(self.db_file, deal_id)
+    
+    def get_deal_stats(self):
+        return load_deal_stats(self.db_file)
     
     def update_deal_status(self, deal_id, status):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        return self.update_deal_statuses([(deal_id, status)]) > 0
+    
+    def update_deal_statuses(self, pairs):
+        rows = [(status, deal_id) for deal_id, status in pairs]
         
-        cursor.execute('UPDATE deals SET status = ? WHERE id = ?', (status, deal_id))
-        success = cursor.rowcount > 0
+        with self.lock, self.conn:
+            cursor = self.conn.executemany(SQL_UPDATE_STATUS, rows)
+            updated = cursor.rowcount
+        
+        clear_deal_caches()
+        return updated
+
+# limit=None loads the whole pipeline
+@st.cache_data(ttl=300, show_spinner=False)
+def load_deals(db_file, limit=None, offset=0):
+    with get_connection_lock(db_file):
+        cursor = get_connection(db_file).execute(SQL_GET_DEALS, (-1 if limit is None else limit, offset))
+        
+        # Build dicts straight off the cursor instead of buffering a fetchall() list;
+        # deal_terms stays the raw JSON string, callers that need it use decode_terms()
+        deals = [dict(row) for row in cursor]
+    
+    # Download names are derived once per load rather than on every render
+    for deal in deals:
+        deal['proposal_filename'] = f"proposal_{deal.get('business_name', 'business').replace(' ', '_')}.txt"
+    
+    return deals
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_deal(db_file, deal_id):
+    with get_connection_lock(db_file):
+        cursor = get_connection(db_file).execute(SQL_GET_DEAL, (deal_id,))
         
-        conn.commit()
-        conn.close()
-        return success
+        row = cursor.fetchone()
+    
+    return dict(row) if row else None
+
+def decode_terms(deal):
+    terms = deal.get('deal_terms')
+    if not terms:
+        return {}
+    if isinstance(terms, dict):
+        return terms
+    try:
+        return loads_json(terms)
+    except ValueError:
+        return {}
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_status_frame(db_file):
+    import pandas as pd
+    
+    with get_connection_lock(db_file):
+        df = pd.read_sql_query(SQL_STATUS_FRAME, get_connection(db_file), index_col='id')
+    
+    # Low-cardinality, read-only columns; status stays plain text for the editor diff
+    return df.astype({'industry': 'category', 'location': 'category'})
+
+# (total, pending, average risk) in one query
+@st.cache_data(ttl=300, show_spinner=False)
+def load_deal_stats(db_file):
+    with get_connection_lock(db_file):
+        return tuple(get_connection(db_file).execute(SQL_DEAL_STATS).fetchone())
+
+# Static for now; the TTL caps a future live query at one per minute
+@st.cache_data(ttl=60, show_spinner=False)
+def get_platform_stats():
+    return PLATFORM_STATS
+
+# Keyed on the deal id only; proposals are never edited after submission
+@st.cache_data(max_entries=256, show_spinner=False)
+def proposal_bytes(deal_id, _proposal):
+    return _proposal.encode('utf-8')
+
+def clear_deal_caches():
+    load_deals.clear()
+    load_deal.clear()
+    load_status_frame.clear()
+    load_deal_stats.clear()
 
 class AIAnalysisEngine:
     def __init__(self):
@@ -225,44 +767,14 @@ class AIAnalysisEngine:
     def calculate_risk_score(self, business_data):
         financial_data = business_data.get('financial_data', {})
         
-        # Industry risk mapping
-        industry_risks = {
-            "Software as a Service (SaaS)": 25,
-            "FinTech": 35,
-            "E-commerce": 45,
-            "Restaurants": 70,
-            "Professional Services": 30,
-            "Manufacturing": 50
-        }
-        
-        industry_risk = industry_risks.get(business_data.get('industry'), 50)
-        
-        # Financial risk calculation
-        financial_risk = 50
-        current_revenue = financial_data.get('current_revenue', 0)
-        
-        if current_revenue > 100000:
-            financial_risk -= 20
-        elif current_revenue > 50000:
-            financial_risk -= 10
-        elif current_revenue == 0:
-            financial_risk += 20
-        
-        if financial_data.get('is_profitable'):
-            financial_risk -= 15
+        industry_risk = INDUSTRY_RISKS.get(business_data.get('industry'), 50)
         
-        # Team risk assessment
-        team_risk = 50
-        team_size = business_data.get('team_size', 1)
-        
-        if 5 <= team_size <= 50:
-            team_risk -= 15
-        elif team_size < 3:
-            team_risk += 20
-        
-        # Calculate overall risk
-        overall_risk = (industry_risk * 0.4 + financial_risk * 0.4 + team_risk * 0.2)
-        overall_risk = max(10, min(90, overall_risk))
+        overall_risk, financial_risk, team_risk = _risk_kernel()(
+            float(industry_risk),
+            float(financial_data.get('current_revenue', 0)),
+            bool(financial_data.get('is_profitable')),
+            float(business_data.get('team_size', 1))
+        )
         
         return {
             'overall_risk': round(overall_risk, 1),
@@ -272,19 +784,48 @@ class AIAnalysisEngine:
             'confidence_score': 85.0,
             'risk_trend': 'Stable Risk'
         }
+    
+    def calculate_risk_scores(self, df):
+        # Batch calculate_risk_score over industry, current_revenue, is_profitable and
+        # team_size columns; missing columns take the scalar defaults
+        import pandas as pd
+        
+        n = len(df)
+        
+        # Narrow dtypes keep the scoring columns compact for the vector math; revenue
+        # stays float64 so values next to a band edge land in the same band as the scalar path
+        def column(name, default, dtype):
+            if name in df:
+                return df[name].fillna(default).to_numpy(dtype=dtype)
+            return np.full(n, default, dtype=dtype)
+        
+        industries = df['industry'] if 'industry' in df else pd.Series(index=df.index, dtype=object)
+        industry_codes = industries.astype(pd.CategoricalDtype(INDUSTRIES)).cat.codes.to_numpy()
+        industry_risk = INDUSTRY_RISK_TABLE[industry_codes]
+        
+        rev = column('current_revenue', 0, np.float64)
+        profitable = column('is_profitable', False, bool)
+        financial_risk = 50 + np.take(REVENUE_DELTAS, np.digitize(rev, REVENUE_BINS, right=True))
+        financial_risk = financial_risk - np.where(profitable, 15, 0)
+        
+        team = column('team_size', 1, np.int32)
+        team_risk = 50 + np.take(TEAM_DELTAS, np.digitize(team, TEAM_BINS))
+        
+        overall_risk = np.clip(industry_risk * 0.4 + financial_risk * 0.4 + team_risk * 0.2, 10, 90)
+        
+        return pd.DataFrame({
+            'overall_risk': overall_risk,
+            'industry_risk': industry_risk,
+            'financial_risk': financial_risk,
+            'team_risk': team_risk
+        }, index=df.index).astype(np.float32).round(1)
 
 class AuthenticationManager:
     def __init__(self):
         self.db = DatabaseManager()
     
     def show_auth_interface(self):
-        st.markdown("""
-        <div style="text-align: center; padding: 2rem; background: linear-gradient(135deg, #2563eb, #7c3aed); 
-                    border-radius: 16px; margin-bottom: 2rem; color: white;">
-            <h1>🏢 EquiReal Enterprise</h1>
-            <p>AI-Powered Commercial Real Estate Platform</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(AUTH_HERO_HTML, unsafe_allow_html=True)
         
         tab1, tab2 = st.tabs(["🔐 Sign In", "📝 Create Account"])
         
@@ -321,7 +862,7 @@ class AuthenticationManager:
             
             if demo_btn:
                 demo_user = {
-                    'id': 'demo_user',
+                    'id': DEMO_USER_ID,
                     'email': 'demo@equireal.com',
                     'user_type': 'business',
                     'profile_data': {'first_name': 'Demo', 'last_name': 'User'}
@@ -367,6 +908,9 @@ class AuthenticationManager:
                     
                 if len(password) < 8:
                     errors.append("Password must be at least 8 characters")
+                
+                if password_too_long(password):
+                    errors.append(f"Password must be at most {BCRYPT_MAX_PASSWORD_BYTES} bytes")
                     
                 if not terms_agreed:
                     errors.append("Please agree to Terms of Service")
@@ -389,6 +933,24 @@ class AuthenticationManager:
                     else:
                         st.error("❌ Email already exists")
 
+@st.cache_data(max_entries=512, show_spinner=False)
+def calculate_deal_terms(risk_score, is_profitable, current_revenue, space_size):
+    (upfront_rent_percent, equity_percent, revenue_share_percent,
+     monthly_rent, monthly_market_rent, monthly_savings) = _deal_terms_kernel()(
+        float(risk_score), is_profitable, float(current_revenue), float(space_size)
+    )
+    
+    return {
+        'risk_score': round(risk_score, 1),
+        'upfront_rent_percent': round(upfront_rent_percent, 1),
+        'equity_percent': round(equity_percent, 1),
+        'revenue_share_percent': round(revenue_share_percent, 1),
+        'monthly_rent': round(monthly_rent, 0),
+        'monthly_market_rent': round(monthly_market_rent, 0),
+        'monthly_savings': round(monthly_savings, 0),
+        'space_size': space_size
+    }
+
 class BusinessApplication:
     def __init__(self):
         self.db = DatabaseManager()
@@ -521,38 +1083,41 @@ class BusinessApplication:
     def step_3_review_submit(self):
         st.markdown("### ✅ Step 3: Review & Submit")
         
-        if 'financial_data' in st.session_state.application_data:
+        application_data = st.session_state.application_data
+        
+        if 'financial_data' in application_data:
+            app_get = application_data.get
+            financial_data = application_data['financial_data']
+            fin_get = financial_data.get
+            
             col1, col2 = st.columns(2)
             
             with col1:
                 st.markdown("**🏢 Business Overview:**")
-                st.write(f"Company: {st.session_state.application_data.get('business_name')}")
-                st.write(f"Industry: {st.session_state.application_data.get('industry')}")
-                st.write(f"Location: {st.session_state.application_data.get('location')}")
-                st.write(f"Space: {st.session_state.application_data.get('space_size', 0):,} sq ft")
+                st.write(f"Company: {app_get('business_name')}")
+                st.write(f"Industry: {app_get('industry')}")
+                st.write(f"Location: {app_get('location')}")
+                st.write(f"Space: {app_get('space_size', 0):,} sq ft")
             
             with col2:
-                financial_data = st.session_state.application_data['financial_data']
                 st.markdown("**💰 Financial Highlights:**")
-                st.write(f"Monthly Revenue: ${financial_data.get('current_revenue', 0):,}")
-                st.write(f"Annual Revenue: ${financial_data.get('annual_revenue', 0):,}")
-                st.write(f"Cash Runway: {financial_data.get('runway_months', 0)} months")
-                st.write(f"Profitable: {'Yes' if financial_data.get('is_profitable', False) else 'No'}")
+                st.write(f"Monthly Revenue: ${fin_get('current_revenue', 0):,}")
+                st.write(f"Annual Revenue: ${fin_get('annual_revenue', 0):,}")
+                st.write(f"Cash Runway: {fin_get('runway_months', 0)} months")
+                st.write(f"Profitable: {'Yes' if fin_get('is_profitable', False) else 'No'}")
             
             if st.button("🔬 Generate AI Analysis & Deal Terms", type="primary", use_container_width=True):
                 with st.spinner("🤖 AI is analyzing your business..."):
                     complete_data = {
-                        **st.session_state.application_data,
-                        'user_id': st.session_state.user.get('id', 'demo_user')
+                        **application_data,
+                        'user_id': st.session_state.user.get('id', DEMO_USER_ID)
                     }
                     
                     ai_analysis = self.ai_engine.calculate_risk_score(complete_data)
                     deal_terms = self.generate_deal_terms(complete_data, ai_analysis)
                     proposal = self.generate_proposal(complete_data, ai_analysis, deal_terms)
                     
-                    business_id = self.db.save_business(complete_data)
-                    deal_id = self.db.save_deal({
-                        'business_id': business_id,
+                    business_id, deal_id = self.db.save_business_and_deal(complete_data, {
                         'deal_terms': deal_terms,
                         'proposal': proposal,
                         'risk_score': ai_analysis['overall_risk']
@@ -569,83 +1134,32 @@ class BusinessApplication:
             st.error("⚠️ Missing application data. Please complete all steps.")
     
     def generate_deal_terms(self, business_data, ai_analysis):
-        risk_score = ai_analysis['overall_risk']
         financial_data = business_data.get('financial_data', {})
         
-        # Base terms
-        base_upfront_rent = 30
-        base_equity = 5
-        base_revenue_share = 3
-        
-        # Risk adjustments
-        risk_factor = (risk_score - 50) / 50
-        
-        upfront_rent_percent = base_upfront_rent + (risk_factor * 20)
-        equity_percent = base_equity + (risk_factor * 5)
-        revenue_share_percent = base_revenue_share + (risk_factor * 2)
-        
-        # Financial adjustments
-        if financial_data.get('is_profitable'):
-            upfront_rent_percent -= 5
-            equity_percent -= 1
-        
-        current_revenue = financial_data.get('current_revenue', 0)
-        if current_revenue > 100000:
-            upfront_rent_percent -= 8
-            equity_percent -= 1.5
-        
-        # Apply bounds
-        upfront_rent_percent = max(15, min(55, upfront_rent_percent))
-        equity_percent = max(1, min(12, equity_percent))
-        revenue_share_percent = max(0.5, min(6, revenue_share_percent))
-        
-        # Calculate rent
-        space_size = business_data.get('space_size', 1000)
-        base_rate = 35  # per sq ft annually
-        
-        annual_market_rent = space_size * base_rate
-        monthly_market_rent = annual_market_rent / 12
-        monthly_rent = monthly_market_rent * (upfront_rent_percent / 100)
-        monthly_savings = monthly_market_rent - monthly_rent
-        
-        return {
-            'risk_score': round(risk_score, 1),
-            'upfront_rent_percent': round(upfront_rent_percent, 1),
-            'equity_percent': round(equity_percent, 1),
-            'revenue_share_percent': round(revenue_share_percent, 1),
-            'monthly_rent': round(monthly_rent, 0),
-            'monthly_market_rent': round(monthly_market_rent, 0),
-            'monthly_savings': round(monthly_savings, 0),
-            'space_size': space_size
-        }
+        return calculate_deal_terms(
+            ai_analysis['overall_risk'],
+            bool(financial_data.get('is_profitable')),
+            financial_data.get('current_revenue', 0),
+            business_data.get('space_size', 1000)
+        )
     
     def generate_proposal(self, business_data, ai_analysis, deal_terms):
-        proposal_id = f"EQR-{str(uuid.uuid4())[:8].upper()}"
-        
-        proposal = f"""EQUIREAL ENTERPRISE PROPOSAL
-{"=" * 50}
-Proposal ID: {proposal_id}
-Generated: {datetime.now().strftime('%B %d, %Y')}
-
-EXECUTIVE SUMMARY
-{"-" * 50}
-Business: {business_data['business_name']}
-Industry: {business_data['industry']}
-Location: {business_data['location']}
-Space: {business_data['space_size']:,} sq ft
-AI Risk Score: {ai_analysis['overall_risk']:.1f}/100
-
-PROPOSED DEAL TERMS
-{"-" * 50}
-Upfront Rent: {deal_terms['upfront_rent_percent']:.1f}% of market rate
-Monthly Rent: ${deal_terms['monthly_rent']:,.0f}
-Equity Stake: {deal_terms['equity_percent']:.1f}%
-Revenue Share: {deal_terms['revenue_share_percent']:.1f}%
-Monthly Savings: ${deal_terms['monthly_savings']:,.0f}
-
-EquiReal - Renting the Opportunity"""
+        return "".join(self.iter_proposal(business_data, ai_analysis, deal_terms))
+    
+    def iter_proposal(self, business_data, ai_analysis, deal_terms):
+        context = {
+            **deal_terms,
+            'proposal_id': f"EQR-{uuid.uuid4().hex[:8].upper()}",
+            'generated': datetime.now().strftime('%B %d, %Y'),
+            'business_name': business_data['business_name'],
+            'industry': business_data['industry'],
+            'location': business_data['location'],
+            'space_size': business_data['space_size'],
+            'overall_risk': ai_analysis['overall_risk']
+        }
         
-        return proposal
+        for part in PROPOSAL_PARTS:
+            yield part.format_map(context)
     
     def show_results(self):
         if 'analysis_results' not in st.session_state:
@@ -665,7 +1179,7 @@ EquiReal - Renting the Opportunity"""
         
         with col1:
             risk_score = ai_analysis['overall_risk']
-            risk_color = "#10b981" if risk_score < 40 else "#f59e0b" if risk_score < 70 else "#ef4444"
+            risk_color = RISK_COLOR[bisect.bisect_right(RISK_BUCKETS, risk_score)]
             st.markdown(f"""
             <div style="text-align: center; padding: 1rem; background: {risk_color}20; 
                         border-radius: 12px; border: 2px solid {risk_color};">
@@ -730,141 +1244,134 @@ class LandlordDashboard:
         self.db = DatabaseManager()
     
     def show_dashboard(self):
-        st.markdown("""
-        <div style="text-align: center; padding: 2rem; background: linear-gradient(135deg, #2563eb, #7c3aed); 
-                    border-radius: 16px; margin-bottom: 2rem; color: white;">
-            <h1>🏢 EquiReal</h1>
-            <p>AI-Powered Commercial Real Estate Platform</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(HERO_HTML, unsafe_allow_html=True)
         
         st.title("🏢 Landlord Dashboard")
         
-        deals = self.db.get_deals()
+        total, pending, avg_risk = self.db.get_deal_stats()
         
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            st.metric("Total Applications", len(deals))
+            st.metric("Total Applications", total)
         
         with col2:
-            pending = len([d for d in deals if d.get('status') == 'pending'])
             st.metric("Pending Review", pending)
         
         with col3:
-            if deals:
-                avg_risk = np.mean([d.get('risk_score', 50) for d in deals])
+            if total:
                 st.metric("Average Risk", f"{avg_risk:.1f}")
             else:
                 st.metric("Average Risk", "N/A")
         
         st.markdown("### 📋 Deal Pipeline")
         
-        if not deals:
+        if not total:
             st.info("No applications yet.")
             return
         
-        for deal in deals[:5]:
-            self.show_deal_card(deal)
+        self.show_status_editor()
+        
+        self.show_deal_cards(self.db.get_deals(limit=5))
     
-    def show_deal_card(self, deal):
-        risk_score = deal.get('risk_score', 50)
-        risk_emoji = "🟢" if risk_score < 40 else "🟡" if risk_score < 70 else "🔴"
+    @st.fragment
+    def show_status_editor(self):
+        df = load_status_frame(self.db.db_file)
+        
+        # Cell edits stay client-side until the form is submitted
+        with st.form("status_form", border=False):
+            edited = st.data_editor(
+                df,
+                column_config={
+                    'business_name': "Business",
+                    'industry': "Industry",
+                    'location': "Location",
+                    'risk_score': st.column_config.NumberColumn("Risk Score", format="%.1f"),
+                    'status': st.column_config.SelectboxColumn("Status", options=DEAL_STATUSES, required=True)
+                },
+                disabled=['business_name', 'industry', 'location', 'risk_score'],
+                hide_index=True,
+                num_rows="fixed",
+                use_container_width=True,
+                key="deals_editor"
+            )
+            
+            submitted = st.form_submit_button("💾 Apply Status Changes", type="primary")
         
-        with st.container():
-            st.markdown(f"""
-            <div style="background: white; border: 1px solid #e5e7eb; border-radius: 12px; 
-                        padding: 1.5rem; margin: 1rem 0; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                <h4>{risk_emoji} {deal.get('business_name', 'Unknown Business')}</h4>
-                <p><strong>Industry:</strong> {deal.get('industry', 'N/A')}</p>
-                <p><strong>Location:</strong> {deal.get('location', 'N/A')}</p>
-                <p><strong>Space:</strong> {deal.get('space_size', 0):,} sq ft</p>
-                <p><strong>Risk Score:</strong> {risk_score:.1f}/100</p>
-            </div>
-            """, unsafe_allow_html=True)
+        if submitted:
+            changed = edited['status'][edited['status'] != df['status']]
             
-            col1, col2, col3 = st.columns(3)
+            if len(changed):
+                self.db.update_deal_statuses(changed.items())
+                st.success(f"✅ Updated {len(changed)} deal(s)")
+                # Full rerun: the pipeline metrics above sit outside this fragment
+                st.rerun(scope="app")
+            else:
+                st.info("No status changes to apply")
+    
+    @st.fragment
+    def show_deal_cards(self, deals):
+        cards = []
+        
+        for deal in deals:
+            risk_score = deal.get('risk_score', 50)
+            risk_emoji = RISK_EMOJI[bisect.bisect_right(RISK_BUCKETS, risk_score)]
+            
+            cards.append(DEAL_CARD_HTML % (
+                risk_emoji,
+                deal.get('business_name', 'Unknown Business'),
+                deal.get('industry', 'N/A'),
+                deal.get('location', 'N/A'),
+                format(deal.get('space_size', 0), ','),
+                risk_score
+            ))
+        
+        st.markdown("\n".join(cards), unsafe_allow_html=True)
+        
+        with_proposals = [deal for deal in deals if deal.get('proposal')]
+        
+        if with_proposals:
+            col1, col2 = st.columns([3, 1], vertical_alignment="bottom")
             
             with col1:
-                if st.button("✅ Approve", key=f"approve_{deal.get('id')}", type="primary"):
-                    if self.db.update_deal_status(deal.get('id'), 'approved'):
-                        st.success("✅ Deal approved!")
-                        st.rerun()
+                deal = st.selectbox(
+                    "Proposal",
+                    with_proposals,
+                    format_func=lambda d: d.get('business_name', 'Unknown Business'),
+                    key="proposal_deal"
+                )
             
             with col2:
-                if st.button("❌ Reject", key=f"reject_{deal.get('id')}"):
-                    if self.db.update_deal_status(deal.get('id'), 'rejected'):
-                        st.error("❌ Deal rejected")
-                        st.rerun()
-            
-            with col3:
-                if deal.get('proposal'):
-                    st.download_button(
-                        label="📄 Proposal",
-                        data=deal['proposal'],
-                        file_name=f"proposal_{deal.get('business_name', 'business').replace(' ', '_')}.txt",
-                        mime="text/plain",
-                        key=f"download_{deal.get('id')}"
-                    )
+                st.download_button(
+                    label="📄 Proposal",
+                    data=proposal_bytes(deal['id'], deal['proposal']),
+                    file_name=deal['proposal_filename'],
+                    mime="text/plain",
+                    use_container_width=True
+                )
 
 def show_business_dashboard():
-    st.markdown("""
-    <div style="text-align: center; padding: 2rem; background: linear-gradient(135deg, #2563eb, #7c3aed); 
-                border-radius: 16px; margin-bottom: 2rem; color: white;">
-        <h1>🏢 EquiReal</h1>
-        <p>AI-Powered Commercial Real Estate Platform</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(HERO_HTML, unsafe_allow_html=True)
     
-    user = st.session_state.user
-    profile = user.get('profile_data', {})
+    first_name = st.session_state.user.get('profile_data', {}).get('first_name', 'Business Owner')
     
-    st.title(f"Welcome, {profile.get('first_name', 'Business Owner')}!")
+    st.title(f"Welcome, {first_name}!")
     
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("Applications", "0", "Start your first!")
-    with col2:
-        st.metric("Proposals", "0", "Pending")
-    with col3:
-        st.metric("Active Deals", "0", "No deals yet")
-    with col4:
-        st.metric("Savings", "$0", "Potential")
+    st.markdown(stats_strip_html(BUSINESS_STATS), unsafe_allow_html=True)
     
     st.markdown("### 🚀 Get Started")
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("""
-        **📋 Create Your First Application**
-        
-        Complete our AI-powered application to get personalized deal terms.
-        - 3-step process
-        - AI risk assessment
-        - Custom deal terms
-        - Instant proposals
-        """)
-        
-        if st.button("🚀 Start Application", type="primary", use_container_width=True):
-            st.session_state.page = 'business_application'
-            st.rerun()
+        st.markdown(DASHBOARD_APPLICATION_MD)
+        
+        nav_button("🚀 Start Application", 'business_application', type="primary", use_container_width=True)
     
     with col2:
-        st.markdown("""
-        **🔍 Browse Properties**
-        
-        Find commercial spaces from forward-thinking landlords.
-        - Curated listings
-        - Partner landlords
-        - Advanced filters
-        - Virtual tours
-        """)
-        
-        if st.button("🔍 Browse Properties", use_container_width=True):
-            st.session_state.page = 'property_search'
-            st.rerun()
+        st.markdown(DASHBOARD_BROWSE_MD)
+        
+        nav_button("🔍 Browse Properties", 'property_search', use_container_width=True)
 
 def show_property_search():
     st.title("🔍 Property Search")
@@ -873,49 +1380,24 @@ def show_property_search():
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        location = st.selectbox("Location", GLOBAL_LOCATIONS)
+        location = st.selectbox("Location", GLOBAL_LOCATIONS, key="search_location")
         min_space = st.number_input("Min Space (sq ft)", min_value=0, value=0)
     
     with col2:
-        property_type = st.selectbox("Property Type", ["Office", "Retail", "Industrial"])
+        property_type = st.selectbox("Property Type", PROPERTY_TYPES, key="search_ptype")
         max_space = st.number_input("Max Space (sq ft)", min_value=0, value=10000)
     
     with col3:
-        price_range = st.selectbox("Price Range", ["$0-25/sq ft", "$25-50/sq ft", "$50+/sq ft"])
+        price_range = st.selectbox("Price Range", PRICE_RANGES, key="search_price")
     
     if st.button("🔍 Search Properties", type="primary"):
         st.success("🎯 Search completed!")
         
-        properties = [
-            {
-                'name': 'Innovation Hub Downtown',
-                'location': 'San Francisco, CA',
-                'size': '1,200-5,000 sq ft',
-                'price': '$45/sq ft/year'
-            },
-            {
-                'name': 'Tech Center Austin',
-                'location': 'Austin, TX',
-                'size': '800-3,000 sq ft',
-                'price': '$28/sq ft/year'
-            }
-        ]
-        
-        for prop in properties:
-            with st.container():
-                st.markdown(f"""
-                <div style="background: white; border: 1px solid #e5e7eb; border-radius: 12px; 
-                            padding: 1.5rem; margin: 1rem 0;">
-                    <h4>{prop['name']}</h4>
-                    <p>📍 {prop['location']}</p>
-                    <p>📐 {prop['size']}</p>
-                    <p>💰 {prop['price']}</p>
-                </div>
-                """, unsafe_allow_html=True)
+        for name, card in PROPERTY_CARDS:
+            with st.container(border=True):
+                st.markdown(card)
                 
-                if st.button("Apply Now", key=f"apply_{prop['name']}"):
-                    st.session_state.page = 'business_application'
-                    st.rerun()
+                nav_button("Apply Now", 'business_application', key=f"apply_{name}")
 
 def show_settings():
     st.title("⚙️ Account Settings")
@@ -935,56 +1417,50 @@ def show_settings():
             company = st.text_input("Company", value=profile.get('company', ''))
         
         if st.form_submit_button("💾 Save Changes", type="primary"):
-            st.success("✅ Profile updated!")
+            changes = {'first_name': first_name, 'last_name': last_name, 'company': company}
+            
+            if all(profile.get(key, '') == value for key, value in changes.items()):
+                st.info("No changes to save")
+                return
+            
+            updated_profile = {**profile, **changes}
+            
+            # Demo sessions never touch the database; only the session copy changes
+            if user['id'] != DEMO_USER_ID and not DatabaseManager().update_user_profile(user['id'], updated_profile):
+                st.error("❌ Could not save your profile")
+                return
+            
+            user['profile_data'] = updated_profile
+            # Toast survives the rerun; the full-app rerun refreshes the sidebar greeting
+            st.toast("✅ Profile updated!")
+            st.rerun(scope="app")
 
 def show_home_page():
-    st.markdown("""
-    <div style="text-align: center; padding: 2rem; background: linear-gradient(135deg, #2563eb, #7c3aed); 
-                border-radius: 16px; margin-bottom: 2rem; color: white;">
-        <h1>🏢 EquiReal</h1>
-        <h3>Renting the Opportunity</h3>
-        <p>Revolutionary AI-powered commercial real estate platform transforming lease structures.</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(HOME_HERO_HTML, unsafe_allow_html=True)
     
     col1, col2 = st.columns(2)
     
     with col1:
-        st.markdown("""
-        **🏢 For Businesses**
-        
-        Get reduced rent in exchange for equity and revenue share.
-        - Reduce monthly rent by 20-60%
-        - AI-powered risk assessment
-        - Custom deal structuring
-        - Connect with landlords
-        """)
+        st.markdown(HOME_BUSINESS_MD)
     
     with col2:
-        st.markdown("""
-        **🏠 For Property Owners**
-        
-        Participate in tenant success through equity sharing.
-        - Higher returns than traditional leases
-        - Equity upside in growing companies
-        - AI-screened tenants
-        - Professional management
-        """)
+        st.markdown(HOME_LANDLORD_MD)
     
     st.markdown("### 📊 Platform Statistics")
     
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("Businesses Analyzed", "1,247")
-    with col2:
-        st.metric("Deals Completed", "89")
-    with col3:
-        st.metric("Partner Landlords", "156")
-    with col4:
-        st.metric("AI Accuracy", "94.2%")
+    st.markdown(stats_strip_html(get_platform_stats()), unsafe_allow_html=True)
+
+PAGE_DISPATCH = {
+    'business_dashboard': show_business_dashboard,
+    'business_application': lambda: BusinessApplication().show_application_wizard(),
+    'landlord_dashboard': lambda: LandlordDashboard().show_dashboard(),
+    'property_search': show_property_search,
+    'settings': show_settings
+}
 
 def main():
+    load_css()
+    
     # Initialize session state
     if 'authenticated' not in st.session_state:
         st.session_state.authenticated = False
@@ -1000,51 +1476,28 @@ def main():
     
     # Authenticated user interface
     user = st.session_state.user
+    user_type = user['user_type']
+    first_name = user.get('profile_data', {}).get('first_name', 'User')
     
     # Sidebar navigation
     with st.sidebar:
-        st.markdown("""
-        <div style="text-align: center; padding: 1.5rem; background: linear-gradient(135deg, #2563eb, #7c3aed); 
-                    border-radius: 16px; margin-bottom: 2rem;">
-            <h2 style="color: white; margin: 0;">🏢 EquiReal</h2>
-            <p style="color: rgba(255,255,255,0.9); margin: 0.5rem 0 0 0;">Enterprise Platform</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        profile = user.get('profile_data', {})
-        st.markdown(f"**Welcome, {profile.get('first_name', 'User')}!**")
-        st.markdown(f"*{user['user_type'].title()} Account*")
+        st.markdown(SIDEBAR_HEADER_HTML, unsafe_allow_html=True)
+        
+        st.markdown(f"**Welcome, {first_name}!**")
+        st.markdown(f"*{user_type.title()} Account*")
         
         st.markdown("---")
         
         # Navigation based on user type
-        if user['user_type'] == 'business':
-            if st.button("🏠 Dashboard", use_container_width=True):
-                st.session_state.page = 'business_dashboard'
-                st.rerun()
-            
-            if st.button("🚀 New Application", use_container_width=True):
-                st.session_state.page = 'business_application'
-                st.rerun()
-            
-            if st.button("🔍 Property Search", use_container_width=True):
-                st.session_state.page = 'property_search'
-                st.rerun()
-        
-        else:  # landlord
-            if st.button("🏠 Dashboard", use_container_width=True):
-                st.session_state.page = 'landlord_dashboard'
-                st.rerun()
+        for label, page in SIDEBAR_NAV.get(user_type, SIDEBAR_NAV['landlord']):
+            nav_button(label, page, use_container_width=True)
         
         st.markdown("---")
         
-        if st.button("⚙️ Settings", use_container_width=True):
-            st.session_state.page = 'settings'
-            st.rerun()
+        nav_button("⚙️ Settings", 'settings', use_container_width=True)
         
         if st.button("🚪 Sign Out", use_container_width=True):
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
+            st.session_state.clear()
             st.rerun()
         
         st.markdown("---")
@@ -1052,21 +1505,12 @@ def main():
         st.write("🔗 Database: ✅ Connected")
         st.write("🤖 AI Engine: ✅ Active")
     
-    # Page routing
-    if st.session_state.page == 'business_dashboard':
-        show_business_dashboard()
-    elif st.session_state.page == 'business_application':
-        app = BusinessApplication()
-        app.show_application_wizard()
-    elif st.session_state.page == 'landlord_dashboard':
-        dashboard = LandlordDashboard()
-        dashboard.show_dashboard()
-    elif st.session_state.page == 'property_search':
-        show_property_search()
-    elif st.session_state.page == 'settings':
-        show_settings()
-    else:
-        show_home_page()
+    render_page()
+
+@st.fragment
+def render_page():
+    # Page routing; interactions inside a page rerun only this fragment, not the sidebar
+    PAGE_DISPATCH.get(st.session_state.page, show_home_page)()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file